@@ -1,9 +1,12 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 import os
+import threading
+from nba_client import NbaApiClient, fetch_draft_history, fetch_player_season_stats, nba_api_health_check
 
 # ==============================================================================
 # 1. SETUP & CONFIG
@@ -153,43 +156,56 @@ ARCH_COLORS = {
 # ==============================================================================
 # 2. NBA API FUNCTIONS
 # ==============================================================================
-@st.cache_data(ttl=86400)
+@st.cache_resource
+def get_nba_client():
+    # cache_resource keeps one client per process across reruns and sessions
+    return NbaApiClient(nba_api_health_check)
+
+def _fetch_nba_players():
+    from nba_api.stats.static import players
+    all_players = players.get_players()
+    df = pd.DataFrame(all_players)
+    df['norm_name'] = df['full_name'].str.lower().str.strip()
+    return df
+
+# The cached functions raise on failure so st.cache_data never stores an empty
+# result; the public wrappers below fall back to last-known-good data instead.
+# Spinners are shown at the call sites since the warm-up thread uses these too.
+@st.cache_data(ttl=86400, show_spinner=False)
+def _cached_nba_players():
+    return get_nba_client().fetch(("nba_players",), _fetch_nba_players)
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _cached_draft_history(year):
+    return get_nba_client().fetch(("draft_history", year), fetch_draft_history, year)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_player_season_stats(player_id, season):
+    return get_nba_client().fetch(("season_stats", player_id, season), fetch_player_season_stats, player_id, season)
+
 def get_nba_players():
-    try:
-        from nba_api.stats.static import players
-        all_players = players.get_players()
-        df = pd.DataFrame(all_players)
-        df['norm_name'] = df['full_name'].str.lower().str.strip()
-        return df
-    except:
-        return pd.DataFrame()
-
-@st.cache_data(ttl=86400)
+    return get_nba_client().get(("nba_players",), _cached_nba_players, default=pd.DataFrame())
+
 def get_draft_history(year):
-    try:
-        from nba_api.stats.endpoints import drafthistory
-        import time
-        time.sleep(0.6)
-        draft = drafthistory.DraftHistory(season_year_nullable=year)
-        df = draft.get_data_frames()[0]
-        return df
-    except:
-        return pd.DataFrame()
-
-@st.cache_data(ttl=3600)
+    return get_nba_client().get(("draft_history", year), _cached_draft_history, year, default=pd.DataFrame())
+
 def get_player_season_stats(player_id, season="2024-25"):
-    try:
-        from nba_api.stats.endpoints import playercareerstats
-        import time
-        time.sleep(0.6)
-        stats = playercareerstats.PlayerCareerStats(player_id=player_id)
-        df = stats.get_data_frames()[0]
-        season_stats = df[df['SEASON_ID'] == season]
-        if len(season_stats) > 0:
-            return season_stats.iloc[0].to_dict()
-        return None
-    except:
-        return None
+    return get_nba_client().get(("season_stats", player_id, season), _cached_player_season_stats, player_id, season)
+
+@st.cache_resource
+def start_draft_history_warmup():
+    """Prefetches draft history for every year with results, once per process, so the first Results view is a cache hit."""
+    df = load_data()
+    years = sorted(int(y) for y in df['year'].unique() if y <= 2025)
+    def warm():
+        for year in years:
+            get_draft_history(year)
+    thread = threading.Thread(target=warm, name="draft-history-warmup", daemon=True)
+    # Cached functions expect a ScriptRunContext; borrow the starting session's.
+    # They run with show_spinner=False, so nothing is written into that page.
+    add_script_run_ctx(thread)
+    thread.start()
+    return thread
 
 def get_player_image_url(player_id):
     if pd.isna(player_id) or player_id == 0 or player_id is None:
@@ -270,7 +286,11 @@ if df is None:
     st.error("Data file not found. Please add your predictions CSV.")
     st.stop()
 
-nba_players = get_nba_players()
+if 'year' in df.columns:
+    start_draft_history_warmup()
+
+with st.spinner("Loading NBA players..."):
+    nba_players = get_nba_players()
 
 # ==============================================================================
 # 4. SIDEBAR
@@ -461,7 +481,8 @@ elif view == "Results":
     else:
         st.markdown(f"**{selected_year} Draft Class** — Comparing predictions to actual results")
         st.caption("⚠️ Note: Rookie stats shown for recent classes. Career value takes 3-5 years to assess.")
-        draft_df = get_draft_history(selected_year)
+        with st.spinner("Loading draft results..."):
+            draft_df = get_draft_history(selected_year)
         if draft_df.empty:
             st.warning("Could not load draft data. NBA API may be unavailable.")
         else:
@@ -474,7 +495,8 @@ elif view == "Results":
                 if len(draft_match) > 0:
                     pick = draft_match.iloc[0]
                     season = "2025-26" if selected_year == 2025 else ("2024-25" if selected_year == 2024 else "2023-24")
-                    stats = get_player_season_stats(pick['PERSON_ID'], season)
+                    with st.spinner(f"Loading stats for {player_name}..."):
+                        stats = get_player_season_stats(pick['PERSON_ID'], season)
                     results.append({
                         'name': player_name, 'pred_rank': pred['rank'],
                         'actual_pick': pick['OVERALL_PICK'], 'team': pick['TEAM_ABBREVIATION'],
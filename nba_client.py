@@ -0,0 +1,194 @@
+"""Process-wide helpers shared by every Streamlit session for nba_api access."""
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import requests
+
+NBA_API_RETRIES = 3
+NBA_API_BACKOFF_BASE = 0.5
+NBA_API_BACKOFF_CAP = 8.0
+NEGATIVE_CACHE_TTL = 60
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30
+NBA_API_TIMEOUT = 10
+NBA_API_REQUEST_DELAY = 0.6
+
+# Only network, HTTP and timeout errors are retried and counted by the breaker.
+# nba_api does not check status codes, so throttling/error pages (including its
+# rewritten {"Message":"An error has occurred."} body) surface as JSON decode errors.
+TRANSIENT_ERRORS = (requests.exceptions.RequestException, json.JSONDecodeError)
+
+class NbaApiUnavailable(Exception):
+    """Raised when a fetch fails, is negatively cached, or the circuit breaker is open."""
+
+class NbaApiPayloadError(Exception):
+    """Raised when an nba_api response parses as JSON but lacks the expected result sets."""
+
+@contextmanager
+def upstream_payload():
+    """Turns nba_api's parsing errors on an unexpected response shape into NbaApiPayloadError."""
+    try:
+        yield
+    except TRANSIENT_ERRORS:
+        raise
+    except (KeyError, IndexError, ValueError) as e:
+        raise NbaApiPayloadError(f"unexpected NBA API response: {e!r}") from e
+
+def fetch_draft_history(year):
+    from nba_api.stats.endpoints import drafthistory
+    time.sleep(NBA_API_REQUEST_DELAY)
+    with upstream_payload():
+        draft = drafthistory.DraftHistory(season_year_nullable=year, timeout=NBA_API_TIMEOUT)
+        return draft.get_data_frames()[0]
+
+def fetch_player_season_stats(player_id, season):
+    from nba_api.stats.endpoints import playercareerstats
+    time.sleep(NBA_API_REQUEST_DELAY)
+    with upstream_payload():
+        stats = playercareerstats.PlayerCareerStats(player_id=player_id, timeout=NBA_API_TIMEOUT)
+        df = stats.get_data_frames()[0]
+        season_stats = df[df['SEASON_ID'] == season]
+    if len(season_stats) > 0:
+        return season_stats.iloc[0].to_dict()
+    return None
+
+def nba_api_health_check():
+    # Fixed, tiny request the circuit breaker uses to decide the API is back
+    from nba_api.stats.endpoints import drafthistory
+    drafthistory.DraftHistory(season_year_nullable=2024, overall_pick_nullable=1, timeout=NBA_API_TIMEOUT).get_dict()
+
+class SingleFlight:
+    """Dedupes concurrent calls: the first caller for a key runs the fetch, the rest wait on its future."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+class CircuitBreaker:
+    """Opens after consecutive failures; while open, a background probe runs the health check until it passes."""
+    def __init__(self, probe, on_close=None, threshold=BREAKER_FAILURE_THRESHOLD,
+                 cooldown=BREAKER_COOLDOWN, sleep=time.sleep):
+        self.probe = probe
+        self.on_close = on_close
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open = False
+        self._probe_thread = None
+
+    @property
+    def is_open(self):
+        return self._open
+
+    def record_success(self):
+        with self._lock:
+            was_open = self._open
+            self._failures = 0
+            self._open = False
+        if was_open and self.on_close is not None:
+            self.on_close()
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures < self.threshold:
+                return
+            self._open = True
+            if self._probe_thread is not None and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(target=self._run_probe, name="nba-api-probe", daemon=True)
+            self._probe_thread.start()
+
+    def _run_probe(self):
+        while self._open:
+            self._sleep(self.cooldown)
+            try:
+                self.probe()
+            except Exception:
+                continue
+            self.record_success()
+
+class NbaApiClient:
+    """Retries nba_api calls with backoff, short-lived negative caching and last-known-good fallback."""
+    def __init__(self, health_check, sleep=time.sleep, clock=time.monotonic):
+        self._sleep = sleep
+        self._clock = clock
+        self.breaker = CircuitBreaker(health_check, on_close=self._clear_negative, sleep=sleep)
+        self.single_flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._last_good = {}
+        self._negative = {}
+
+    def fetch(self, key, fn, *args):
+        with self._lock:
+            if self._clock() < self._negative.get(key, 0):
+                raise NbaApiUnavailable(f"{key} failed recently")
+        if self.breaker.is_open:
+            raise NbaApiUnavailable("NBA API circuit breaker is open")
+        return self.single_flight.do(key, self._fetch_with_retry, key, fn, *args)
+
+    def get(self, key, loader, *args, default=None):
+        """Calls loader (which raises NbaApiUnavailable on failure), falling back to last-known-good data."""
+        try:
+            return loader(*args)
+        except NbaApiUnavailable:
+            return self.last_good(key, default)
+
+    def last_good(self, key, default=None):
+        with self._lock:
+            return self._last_good.get(key, default)
+
+    def _fetch_with_retry(self, key, fn, *args):
+        for attempt in range(NBA_API_RETRIES):
+            try:
+                value = fn(*args)
+            except NbaApiPayloadError as e:
+                # A malformed payload is unlikely to fix itself on an immediate
+                # retry and says nothing about availability, so skip both
+                self._mark_failed(key)
+                raise NbaApiUnavailable(f"{key} returned an unexpected payload") from e
+            except TRANSIENT_ERRORS as e:
+                error = e
+                if attempt < NBA_API_RETRIES - 1 and not self.breaker.is_open:
+                    self._sleep(random.uniform(0, min(NBA_API_BACKOFF_CAP, NBA_API_BACKOFF_BASE * 2 ** attempt)))
+                    continue
+                break
+            self.breaker.record_success()
+            with self._lock:
+                self._last_good[key] = value
+                self._negative.pop(key, None)
+            return value
+        self._mark_failed(key)
+        self.breaker.record_failure()
+        raise NbaApiUnavailable(f"{key} failed after {attempt + 1} attempts") from error
+
+    def _mark_failed(self, key):
+        with self._lock:
+            self._negative[key] = self._clock() + NEGATIVE_CACHE_TTL
+
+    def _clear_negative(self):
+        with self._lock:
+            self._negative.clear()
@@ -0,0 +1,324 @@
+import json
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from nba_api.stats.endpoints import drafthistory, playercareerstats
+from nba_api.stats.library.http import NBAStatsHTTP
+
+import nba_client
+from nba_client import (
+    BREAKER_FAILURE_THRESHOLD,
+    NBA_API_BACKOFF_CAP,
+    NBA_API_RETRIES,
+    NEGATIVE_CACHE_TTL,
+    NbaApiClient,
+    NbaApiPayloadError,
+    NbaApiUnavailable,
+    SingleFlight,
+    fetch_draft_history,
+    fetch_player_season_stats,
+    nba_api_health_check,
+)
+
+N_CALLERS = 16
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+@pytest.fixture
+def waiting(monkeypatch):
+    """Counts callers blocked on a SingleFlight future."""
+    count = []
+
+    class CountingFuture(Future):
+        def result(self, timeout=None):
+            count.append(1)
+            return super().result(timeout)
+
+    monkeypatch.setattr(nba_client, "Future", CountingFuture)
+    return lambda: len(count)
+
+def _run_concurrently(fn):
+    barrier = threading.Barrier(N_CALLERS)
+    results, errors = [], []
+
+    def caller():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(N_CALLERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert not any(t.is_alive() for t in threads)
+    return results, errors
+
+def _blocking_stub(outcome, waiting):
+    calls, released = [], []
+
+    def fetch(key):
+        calls.append(key)
+        # Hold the leader until every other caller has queued behind it
+        released.append(_wait_for(lambda: waiting() == N_CALLERS - 1))
+        return outcome(key)
+
+    return fetch, calls, released
+
+def test_concurrent_callers_share_one_upstream_call(waiting):
+    sf = SingleFlight()
+    fetch, calls, released = _blocking_stub(lambda key: {"key": key}, waiting)
+
+    results, errors = _run_concurrently(lambda: sf.do(("draft_history", 2024), fetch, 2024))
+
+    assert released == [True]
+    assert calls == [2024]
+    assert errors == []
+    assert len(results) == N_CALLERS
+    assert all(r is results[0] for r in results)
+
+def test_exception_reaches_every_waiter(waiting):
+    sf = SingleFlight()
+
+    def boom(key):
+        raise RuntimeError(f"upstream failed for {key}")
+
+    fetch, calls, released = _blocking_stub(boom, waiting)
+
+    results, errors = _run_concurrently(lambda: sf.do(("draft_history", 2024), fetch, 2024))
+
+    assert released == [True]
+    assert calls == [2024]
+    assert results == []
+    assert len(errors) == N_CALLERS
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+def test_key_is_released_after_completion():
+    sf = SingleFlight()
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        return key
+
+    assert sf.do("k", fetch, 1) == 1
+    assert sf.do("k", fetch, 2) == 2
+    assert calls == [1, 2]
+
+# ------------------------------------------------------------------------------
+# Failure injection: the production nba_api fetchers against a local stand-in
+# ------------------------------------------------------------------------------
+def _result_sets(endpoint_cls, rows):
+    # Like the real API, the sets given rows come first (get_data_frames()[0])
+    names = list(rows) + [name for name in endpoint_cls.expected_data if name not in rows]
+    return {"resultSets": [
+        {"name": name, "headers": endpoint_cls.expected_data[name],
+         "rowSet": [[row.get(h) for h in endpoint_cls.expected_data[name]] for row in rows.get(name, [])]}
+        for name in names
+    ]}
+
+OK_BODIES = {
+    "/drafthistory": _result_sets(drafthistory.DraftHistory, {"DraftHistory": [
+        {"PERSON_ID": 1641705, "PLAYER_NAME": "Victor Wembanyama", "SEASON": "2023", "OVERALL_PICK": 1},
+    ]}),
+    "/playercareerstats": _result_sets(playercareerstats.PlayerCareerStats, {"SeasonTotalsRegularSeason": [
+        {"PLAYER_ID": 1641705, "SEASON_ID": "2024-25", "GP": 46, "PTS": 1116, "REB": 506, "AST": 168},
+    ]}),
+}
+
+class StandIn:
+    """Mimics stats.nba.com: valid payloads, 503 pages, error JSON, odd shapes or hangs past the timeout."""
+    def __init__(self):
+        self.mode = "ok"
+        self.hits = {}
+        self._lock = threading.Lock()
+
+    def handle(self, handler):
+        path, _, query = handler.path.partition("?")
+        name = "health" if "OverallPick=1" in query else path
+        with self._lock:
+            self.hits[name] = self.hits.get(name, 0) + 1
+        if self.mode == "timeout":
+            time.sleep(0.5)
+        if self.mode in ("503", "timeout"):
+            self._send(handler, 503, "text/html", b"<html><body>Service Unavailable</body></html>")
+        elif self.mode == "error_message":
+            self._send(handler, 500, "application/json", b'{"Message":"An error has occurred."}')
+        elif self.mode == "bad_shape":
+            self._send(handler, 200, "application/json", b'{"resource": "drafthistory"}')
+        else:
+            self._send(handler, 200, "application/json", json.dumps(OK_BODIES[path]).encode())
+
+    @staticmethod
+    def _send(handler, status, content_type, body):
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", content_type)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client already gave up on a timed-out request
+            pass
+
+    def data_hits(self):
+        return sum(n for name, n in self.hits.items() if name != "health")
+
+class FakeClock:
+    """Monotonic clock whose sleep advances virtual time instead of blocking."""
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        # Yield so background probe loops don't spin the CPU
+        time.sleep(0.001)
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    state = StandIn()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state.handle(self)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    monkeypatch.setattr(NBAStatsHTTP, "base_url", f"http://127.0.0.1:{server.server_port}/{{endpoint}}")
+    monkeypatch.setattr(nba_client, "NBA_API_TIMEOUT", 0.2)
+    monkeypatch.setattr(nba_client, "NBA_API_REQUEST_DELAY", 0)
+    yield state
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def client(stand_in, clock):
+    return NbaApiClient(nba_api_health_check, sleep=clock.sleep, clock=clock)
+
+def test_fetchers_parse_stand_in_payloads(stand_in):
+    draft = fetch_draft_history(2023)
+    assert draft.iloc[0]["PLAYER_NAME"] == "Victor Wembanyama"
+    assert fetch_player_season_stats(1641705, "2024-25")["PTS"] == 1116
+    assert fetch_player_season_stats(1641705, "2023-24") is None
+
+@pytest.mark.parametrize("mode, error", [
+    ("503", json.JSONDecodeError),
+    ("error_message", json.JSONDecodeError),
+    ("timeout", requests.exceptions.ReadTimeout),
+    ("bad_shape", NbaApiPayloadError),
+])
+def test_upstream_failures_surface_as_classified_errors(stand_in, mode, error):
+    stand_in.mode = mode
+    with pytest.raises(error):
+        fetch_draft_history(2023)
+
+@pytest.mark.parametrize("mode", ["503", "error_message", "timeout"])
+def test_transient_failures_retry_up_to_limit(stand_in, client, clock, mode):
+    stand_in.mode = mode
+
+    with pytest.raises(NbaApiUnavailable):
+        client.fetch(("draft_history", 2023), fetch_draft_history, 2023)
+
+    assert stand_in.hits["/drafthistory"] == NBA_API_RETRIES
+    assert len(clock.sleeps) == NBA_API_RETRIES - 1
+    assert all(0 <= s <= NBA_API_BACKOFF_CAP for s in clock.sleeps)
+
+def test_negative_cache_blocks_refetch_within_ttl(stand_in, client, clock):
+    key = ("draft_history", 2023)
+    stand_in.mode = "503"
+    with pytest.raises(NbaApiUnavailable):
+        client.fetch(key, fetch_draft_history, 2023)
+    stand_in.mode = "ok"
+
+    clock.now += NEGATIVE_CACHE_TTL - 1
+    with pytest.raises(NbaApiUnavailable, match="failed recently"):
+        client.fetch(key, fetch_draft_history, 2023)
+    assert stand_in.hits["/drafthistory"] == NBA_API_RETRIES
+
+    clock.now += 2
+    assert len(client.fetch(key, fetch_draft_history, 2023)) == 1
+
+def test_breaker_opens_at_threshold_and_closes_after_probe(stand_in, client):
+    stand_in.mode = "503"
+    for player_id in range(BREAKER_FAILURE_THRESHOLD):
+        assert not client.breaker.is_open
+        with pytest.raises(NbaApiUnavailable):
+            client.fetch(("season_stats", player_id, "2024-25"), fetch_player_season_stats, player_id, "2024-25")
+    assert client.breaker.is_open
+
+    hits = stand_in.data_hits()
+    with pytest.raises(NbaApiUnavailable, match="circuit breaker is open"):
+        client.fetch(("draft_history", 2023), fetch_draft_history, 2023)
+    assert stand_in.data_hits() == hits
+
+    stand_in.mode = "ok"
+    assert _wait_for(lambda: not client.breaker.is_open)
+    assert stand_in.hits["health"] > 0
+    # Recovery clears negative entries for every key, not just the probed one
+    stats = client.fetch(("season_stats", 0, "2024-25"), fetch_player_season_stats, 0, "2024-25")
+    assert stats["GP"] == 46
+
+def test_payload_errors_are_negatively_cached_without_retry(stand_in, client, clock):
+    stand_in.mode = "bad_shape"
+    for year in range(2015, 2015 + BREAKER_FAILURE_THRESHOLD + 1):
+        with pytest.raises(NbaApiUnavailable, match="unexpected payload"):
+            client.fetch(("draft_history", year), fetch_draft_history, year)
+
+    assert stand_in.hits["/drafthistory"] == BREAKER_FAILURE_THRESHOLD + 1
+    assert clock.sleeps == []
+    assert not client.breaker.is_open
+    with pytest.raises(NbaApiUnavailable, match="failed recently"):
+        client.fetch(("draft_history", 2015), fetch_draft_history, 2015)
+    assert client.get(("draft_history", 2015), client.fetch, ("draft_history", 2015),
+                      fetch_draft_history, 2015, default="fallback") == "fallback"
+
+def test_programming_errors_propagate(client):
+    calls = []
+
+    def broken(player_id):
+        calls.append(player_id)
+        raise AttributeError("'NoneType' object has no attribute 'iloc'")
+
+    with pytest.raises(AttributeError):
+        client.fetch(("season_stats", 1, "2024-25"), broken, 1)
+    assert calls == [1]
+    assert not client.breaker.is_open
+
+def test_get_serves_last_known_good_during_outage(stand_in, client):
+    key = ("draft_history", 2023)
+
+    def load():
+        return client.fetch(key, fetch_draft_history, 2023)
+
+    first = client.get(key, load)
+    assert first.iloc[0]["PLAYER_NAME"] == "Victor Wembanyama"
+
+    stand_in.mode = "503"
+    assert client.get(key, load) is first
+    assert client.get(("draft_history", 2022), client.fetch, ("draft_history", 2022),
+                      fetch_draft_history, 2022, default="fallback") == "fallback"